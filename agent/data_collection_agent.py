@@ -1,9 +1,28 @@
 import json
-import requests
+import asyncio
+import aiohttp
+import gzip
 import time
 import logging
+import math
+import random
+from collections import defaultdict
 from datetime import datetime
 import os
+import sys
+
+try:
+    import orjson # Optional: fast C-based JSON serializer
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np # Optional: vectorized unit conversion for large collection runs
+except ImportError:
+    np = None
+
+# Both parsers accept the raw response bytes, so API payloads skip the str decode step
+_json_loads = orjson.loads if orjson is not None else json.loads
 
 # --- 1. Configuration Management & Logging Setup ---
 
@@ -20,27 +39,201 @@ METADATA_DIR = os.path.join(DATA_DIR, 'metadata') # NEW: Metadata Directory
 LOGS_DIR = os.path.join(os.path.dirname(BASE_DIR), 'logs')
 REPORTS_DIR = os.path.join(os.path.dirname(BASE_DIR), 'reports')
 
-# Create necessary directories
-os.makedirs(LOGS_DIR, exist_ok=True)
-os.makedirs(REPORTS_DIR, exist_ok=True)
-os.makedirs(RAW_DIR, exist_ok=True)
-os.makedirs(PROCESSED_DIR, exist_ok=True)
-os.makedirs(METADATA_DIR, exist_ok=True) # NEW: Create Metadata Directory
+# Maximum number of concurrent requests per API host (Respectful Collection)
+PER_HOST_CONCURRENCY = 2
+
+# Statuses that mean the API key was rejected; retrying won't change the outcome (Adaptive Strategy)
+AUTH_FAILURE_STATUSES = (401, 403)
+
+# Status each API answers with when it does not know the city; only these and 200 say anything about
+# how an API serves a given city, so other failures are kept out of the per-city stats (Adaptive Strategy)
+CITY_NOT_FOUND_STATUS = {'OpenWeatherMap': 404, 'WeatherAPI': 400}
+
+# Exact kph -> m/s factor (1 m/s = 3.6 kph)
+_KPH_TO_MS = 1.0 / 3.6
+
+# Runs targeting more cities than this convert WeatherAPI wind speeds in one NumPy batch (Data Processing)
+VECTORIZE_MIN_CITIES = 100
+
+# Timestamp format of the "Report Generated" banner; the markdown summary shows its date part
+REPORT_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Necessary directories, created by _ensure_dirs() when an agent is initialized rather than at import
+DIRS = (LOGS_DIR, REPORTS_DIR, RAW_DIR, PROCESSED_DIR, METADATA_DIR)
 
 LOG_FILE = os.path.join(LOGS_DIR, 'collection.log')
 
+# Required fields for the quality assessment, pre-split into key paths per API (Data Quality Assessment)
+# NOTE: OWM paths include the 'current' prefix as OWM data is stored under the 'current' key
+OWM_REQUIRED = (('current', 'main', 'temp'), ('current', 'main', 'humidity'), ('current', 'wind', 'speed'))
+WAPI_REQUIRED = (('current', 'temp_c'), ('current', 'humidity'), ('current', 'wind_kph'))
+
+def _ensure_dirs():
+    """Creates any of the necessary directories that do not exist yet."""
+    for path in DIRS:
+        if not os.path.isdir(path): # Single stat for directories that are already present
+            os.makedirs(path, exist_ok=True)
+
+def _retry_after_seconds(headers, max_wait):
+    """
+    Returns the Retry-After header in seconds, capped at max_wait, or None if it is missing,
+    not given in seconds, negative or not finite.
+    """
+    try:
+        retry_after = float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(retry_after) or retry_after < 0:
+        return None
+    return min(retry_after, max_wait)
+
+def _write_json(filepath, obj):
+    """Writes obj to filepath as indented JSON, using orjson when it is installed."""
+    if orjson is not None:
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        # Match orjson's output: raw UTF-8 rather than \u escapes in the locale encoding
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, indent=2, ensure_ascii=False)
+
+def _open_raw_stream(filepath):
+    """Opens the raw NDJSON stream for binary writing, gzip-compressed when the path ends in .gz."""
+    if filepath.endswith('.gz'):
+        # Level 1 keeps compression cheap; most of the savings come from the repetitive JSON structure
+        return gzip.open(filepath, 'wb', compresslevel=1)
+    return open(filepath, 'wb')
+
+def _ndjson_line(obj):
+    """Serializes obj as one compact JSON line (bytes) for an append-only NDJSON stream."""
+    if orjson is not None:
+        return orjson.dumps(obj) + b'\n'
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8') + b'\n'
+
+# Static report boilerplate, defined once; only the dynamic fields are substituted per run (Documentation)
+_HTML_HEAD = """
+        <!DOCTYPE html>
+        <html lang="en">
+        <head>
+            <meta charset="UTF-8">
+            <title>Data Quality Report - Weather Agent</title>
+            <style>
+                body { font-family: Arial, sans-serif; margin: 20px; background-color: #f4f7f6; }
+                .container { max-width: 900px; margin: auto; background: white; padding: 25px; border-radius: 8px; box-shadow: 0 4px 8px rgba(0,0,0,0.1); }
+                h1 { color: #007bff; border-bottom: 2px solid #007bff; padding-bottom: 10px; }
+                h2 { color: #333; margin-top: 25px; }
+                table { width: 100%; border-collapse: collapse; margin-top: 15px; }
+                th, td { border: 1px solid #ddd; padding: 12px; text-align: left; }
+                th { background-color: #f2f2f2; color: #333; }
+                .metric-box { background-color: #e9ecef; padding: 15px; border-radius: 6px; margin-bottom: 20px; }
+                .success { color: green; font-weight: bold; }
+                .failure { color: red; font-weight: bold; }
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <h1>Weather Agent Data Quality Report</h1>"""
+
+_HTML_METRICS_TMPL = """
+                <p>Report Generated: {generated_at}</p>
+
+                <h2>Overall Collection Metrics</h2>
+                <div class="metric-box">
+                    <p><strong>Total Records (Cities) Collected:</strong> {successful_requests}</p>
+                    <p><strong>Total API Requests Made:</strong> {total_requests}</p>
+                    <p><strong>Collection Success Rate:</strong> <span class="{success_class}">{success_rate:.2f}%</span></p>
+                    <p><strong>Total Data Points Parsed:</strong> {data_points_collected}</p>
+                </div>
+
+                <h2>Quality Assessment Metrics</h2>
+                <div class="metric-box">
+                    <p><strong>Average Data Quality Score (Completeness/Validity):</strong> {avg_quality:.2f}/100</p>
+                    <p><strong>API Success Breakdown:</strong> OWM ({owm_success}) / WAPI ({wapi_success})</p>
+                    <p><strong>Issues Logged:</strong> {issues_logged}</p>
+                </div>
+                
+                <h2>Per-Record Quality Details</h2>
+                <table>
+                    <tr>
+                        <th>#</th>
+                        <th>City</th>
+                        <th>API Used</th>
+                        <th>Quality Score (100 Max)</th>
+                        <th>Notes</th>
+                    </tr>
+        """
+
+_HTML_ROW_TMPL = """
+                    <tr>
+                        <td>{index}</td>
+                        <td>{city}</td>
+                        <td>{api}</td>
+                        <td>{quality_score}/100</td>
+                        <td>{notes}</td>
+                    </tr>
+            """
+
+_HTML_FOOT = """
+                </table>
+            </div>
+        </body>
+        </html>
+        """
+
+_SUMMARY_MD_TMPL = """
+# Weather Agent Collection Summary Report
+
+**Date:** {date}
+**Agent Status:** Completed
+
+## 1. Collection Performance
+
+| Metric | Value |
+| :--- | :--- |
+| **Total Cities Targeted** | {cities_targeted} |
+| **Total Records Collected** | {successful_requests} |
+| **Total API Requests Sent** | {total_requests} |
+| **Collection Success Rate** | {success_rate:.2f}% |
+| **Total Failures (Hard)** | {failures} |
+
+## 2. API Breakdown
+
+| API | Successful Requests | Failure Rate |
+| :--- | :--- | :--- |
+| **OpenWeatherMap** | {owm_success} | {owm_fail_rate:.2f}% |
+| **WeatherAPI.com** | {wapi_success} | (Handled by Adaptive Strategy) |
+
+## 3. Quality Metrics and Trends
+
+- **Average Data Quality Score:** **{avg_quality:.2f}/100**
+- **Completeness Trend:** High, except where forecast endpoints returned truncated data or missing fields (notably for one API in one city).
+- **Consistency/Validity Trend:** Valid temperature ranges were observed, suggesting high accuracy for the core numerical data. Low scores usually indicated missing secondary fields (e.g., specific wind direction codes).
+
+## 4. Issues Encountered
+
+The Adaptive Strategy successfully handled temporary connection issues or rate limits using retries.
+The following hard issues remain:
+{issues_section}
+
+## 5. Recommendations for Future Collection
+
+1.  **Optimize OWM Forecast:** Switch OWM forecast collection from the general 5-day/3-hour endpoint to the One Call API (if available on the key tier) for better hourly data integration.
+2.  **Granular Quality Check:** Implement a check for **data freshness** (e.g., `dt` or `last_updated` field) to ensure collected "current" data is no older than 15 minutes.
+3.  **Data Storage:** The agent now saves **raw**, **processed**, and **metadata** to their respective folders with timestamps for traceability.
+"""
+
 # Setup logging for Respectful Collection
+# basicConfig shares a single Formatter across the handlers; the console handler is only added when a terminal
+# is attached, so headless/cron runs format each record once for the log file
+# Overwrite log for a new run; delay opening the file until the first record, once _ensure_dirs() has run
+log_handlers = [logging.FileHandler(LOG_FILE, mode='w', delay=True)]
+if sys.stderr.isatty():
+    log_handlers.append(logging.StreamHandler())
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s',
-    filename=LOG_FILE,
-    filemode='w' # Overwrite log for a new run
+    handlers=log_handlers
 )
-console = logging.StreamHandler()
-console.setLevel(logging.INFO)
-formatter = logging.Formatter('%(levelname)s: %(message)s')
-console.setFormatter(formatter)
-logging.getLogger('').addHandler(console)
 
 
 class WeatherAgent:
@@ -50,13 +243,36 @@ class WeatherAgent:
     quality assessment, adaptive retries, and respectful collection practices.
     """
     def __init__(self):
+        _ensure_dirs()
         self.config = self._load_config()
         self.api_keys = self.config['API_KEYS']
         # self.settings now points directly to the contents of 'COLLECTION_SETTINGS' from config.json
         self.settings = self.config['COLLECTION_SETTINGS']
-        self.raw_data = []
+        # Optional LOG_LEVEL (e.g. "WARNING" in production) drops lower-level records before they are formatted
+        logging.getLogger().setLevel(self.settings.get('LOG_LEVEL', 'INFO'))
+        # Shared aiohttp session, opened for the duration of collect_data() so connections are pooled and kept alive
+        self.session = None
+        # Per-API semaphores, created in collect_data(); they throttle each origin without limiting total parallelism
+        self._host_slots = {}
+        # APIs whose key was rejected this run, and the time.monotonic() deadline before which a rate-limited (429)
+        # API gets no further requests
+        self._rejected_apis = set()
+        self._not_before = {}
+        # Raw API payloads are streamed to disk per city (see _store_record); only processed records stay in memory
+        # Opened on the first collected record; a failed open or write stops streaming but not collection
+        self._raw_file = None
+        self._raw_stream_failed = False
         self.processed_data = [] 
+        # WAPI (processed record, wind_kph) pairs awaiting the batched kph -> m/s conversion in _convert_wind_speeds()
+        self._batch_wind_conversion = np is not None and len(self.settings['CITIES']) > VECTORIZE_MIN_CITIES
+        self._pending_wind_kph = []
         self.collection_timestamp = datetime.now().strftime('%Y%m%d_%H%M%S') 
+        # Output file paths, resolved once; they all share the collection timestamp for uniqueness
+        self._paths = self._resolve_paths()
+        # Set by run_agent() right before the reports are written, so both carry the same time
+        self._report_generated_at = None
+        # Derived report rates, computed by _finalize_metrics()
+        self._final_metrics = None
         self.summary_metrics = {
             'total_requests': 0,
             'successful_requests': 0,
@@ -67,6 +283,10 @@ class WeatherAgent:
             'total_quality_score': 0,
             'issues': []
         }
+        # Issues indexed by the city they were logged for, so reports can look them up directly
+        self._issues_by_city = defaultdict(list)
+        # Per-city API success/fail counts carried over from the previous run's metadata (Adaptive Strategy)
+        self._city_api_stats = self._load_city_api_stats()
         logging.info("Agent initialized and configuration loaded.")
 
     def _load_config(self):
@@ -75,12 +295,100 @@ class WeatherAgent:
             with open(CONFIG_PATH, 'r') as f:
                 return json.load(f)
         except FileNotFoundError:
-            logging.error(f"Configuration file not found at {CONFIG_PATH}. Exiting.")
+            logging.error("Configuration file not found at %s. Exiting.", CONFIG_PATH)
             raise
 
+    def _resolve_paths(self):
+        """Builds the timestamped paths of every file this run writes."""
+        ts = self.collection_timestamp
+        # Raw payloads compress well, so they are gzipped unless COMPRESS_RAW_DATA is turned off
+        raw_suffix = '.ndjson.gz' if self.settings.get('COMPRESS_RAW_DATA', True) else '.ndjson'
+        return {
+            'raw_ndjson': os.path.join(RAW_DIR, f"weather_raw_{ts}{raw_suffix}"),
+            'processed_json': os.path.join(PROCESSED_DIR, f"weather_processed_{ts}.json"),
+            'metadata_json': os.path.join(METADATA_DIR, f"collection_metadata_{ts}.json"),
+            'report_html': os.path.join(REPORTS_DIR, f"quality_report_{ts}.html"),
+            'summary_md': os.path.join(REPORTS_DIR, f"collection_summary_{ts}.md")
+        }
+
+    def _load_city_api_stats(self):
+        """Loads the per-city API stats from the most recent metadata file, if there is one."""
+        metadata_files = sorted(f for f in os.listdir(METADATA_DIR) if f.startswith('collection_metadata_') and f.endswith('.json'))
+        if not metadata_files:
+            return {}
+        latest_path = os.path.join(METADATA_DIR, metadata_files[-1])
+        try:
+            with open(latest_path, 'rb') as f:
+                return _json_loads(f.read()).get('city_api_stats', {})
+        except Exception as e:
+            logging.warning("Could not load API stats from %s: %s", latest_path, e)
+            return {}
+
+    def _update_city_api_stats(self, city, api_name, success):
+        """Counts a successful or failed fetch of city from api_name; called only for city-specific outcomes."""
+        counts = self._city_api_stats.setdefault(city, {}).setdefault(api_name, {'success': 0, 'fail': 0})
+        counts['success' if success else 'fail'] += 1
+
+    def _api_success_rate(self, city, api_name):
+        """
+        Smoothed success rate of api_name for city; an API with no history scores 0.5,
+        so one that keeps failing for a city drops below an untried alternative.
+        """
+        counts = self._city_api_stats.get(city, {}).get(api_name, {})
+        success = counts.get('success', 0)
+        return (success + 1) / (success + counts.get('fail', 0) + 2)
+
+    def _record_issue(self, city, message):
+        """Records an issue in the summary metrics and indexes it under its city."""
+        self.summary_metrics['issues'].append(message)
+        self._issues_by_city[city].append(message)
+
     # --- API Helper Functions (Intelligent Collection) ---
 
-    def _fetch_owm_data(self, city):
+    def _note_failed_response(self, api_name, response):
+        """
+        Adapts to a failed response: rejected keys disable the API for the rest of the run,
+        and a 429 with a Retry-After header pauses every request to that API until it has passed.
+        """
+        if response.status in AUTH_FAILURE_STATUSES:
+            if api_name not in self._rejected_apis:
+                logging.error("%s rejected the API key (Status %s); skipping it for the rest of the run.", api_name, response.status)
+                self.summary_metrics['issues'].append(f"{api_name} rejected the API key (Status {response.status}); it was skipped for the rest of the run.")
+            self._rejected_apis.add(api_name)
+        elif response.status == 429:
+            # Capped, so a single response cannot stall the API for the rest of the run
+            retry_after = _retry_after_seconds(response.headers, self.settings.get('MAX_RETRY_AFTER_SECONDS', 60))
+            if retry_after is not None:
+                deadline = time.monotonic() + retry_after
+                self._not_before[api_name] = max(deadline, self._not_before.get(api_name, 0))
+
+    async def _wait_for_host(self, api_name):
+        """Waits out any Retry-After pause on api_name; called with a host slot held, right before sending."""
+        # Re-checked after each sleep, since another 429 may have pushed the deadline back meanwhile
+        remaining = self._not_before.get(api_name, 0) - time.monotonic()
+        while remaining > 0:
+            await asyncio.sleep(remaining)
+            remaining = self._not_before.get(api_name, 0) - time.monotonic()
+
+    async def _fetch_owm_endpoint(self, city, name, url):
+        """
+        Fetches a single OpenWeatherMap endpoint, returning (status, decoded JSON);
+        the JSON is None on failure and the status is None if no response arrived.
+        """
+        self.summary_metrics['total_requests'] += 1
+        logging.info("OWM: Requesting %s for %s", name, city)
+        try:
+            async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status == 200:
+                    return 200, _json_loads(await response.read())
+                logging.warning("OWM Failed %s for %s: Status %s", name, city, response.status)
+                self._note_failed_response('OpenWeatherMap', response)
+                return response.status, None
+        except Exception as e:
+            logging.error("OWM Exception during %s fetch for %s: %s", name, city, e)
+        return None, None
+
+    async def _fetch_owm_data(self, city):
         """Fetches current weather and 5-day forecast from OpenWeatherMap."""
         key = self.api_keys['OPENWEATHERMAP_KEY']
         unit = self.settings['UNITS']
@@ -91,95 +399,169 @@ class WeatherAgent:
             'forecast': f"http://api.openweathermap.org/data/2.5/forecast?q={city}&units={unit}&appid={key}"
         }
         
-        data = {}
-        overall_success = False # Only set to True if at least one endpoint succeeds
-        
-        for name, url in endpoints.items():
-            self.summary_metrics['total_requests'] += 1
-            logging.info(f"OWM: Requesting {name} for {city}")
-            try:
-                response = requests.get(url, timeout=10)
-                if response.status_code == 200:
-                    data[name] = response.json()
-                    self.summary_metrics['owm_success'] += 1
-                    overall_success = True
-                else:
-                    logging.warning(f"OWM Failed {name} for {city}: Status {response.status_code}")
-            except Exception as e:
-                logging.error(f"OWM Exception during {name} fetch for {city}: {e}")
-                
-            time.sleep(self.settings['RESPECTFUL_DELAY_SECONDS']) # Respectful Collection
-
-        if overall_success:
+        # The host slot is held through the delay, so only requests to OWM are spaced out
+        async with self._host_slots['OpenWeatherMap']:
+            # The key may have been rejected while this city waited for a slot
+            if 'OpenWeatherMap' in self._rejected_apis:
+                return None
+            await self._wait_for_host('OpenWeatherMap')
+            # Both endpoints are requested concurrently so their round trips overlap
+            results = await asyncio.gather(
+                *(self._fetch_owm_endpoint(city, name, url) for name, url in endpoints.items())
+            )
+            # No delay after a rejected key, since no further OWM requests will follow
+            if 'OpenWeatherMap' not in self._rejected_apis:
+                # Respectful Collection, once per endpoint pair
+                await asyncio.sleep(self.settings['RESPECTFUL_DELAY_SECONDS'])
+
+        data = {name: payload for name, (_, payload) in zip(endpoints, results) if payload is not None}
+        self.summary_metrics['owm_success'] += len(data)
+
+        # Rejected keys, rate limits and timeouts say nothing about OWM's coverage of this city
+        if data:
+            self._update_city_api_stats(city, 'OpenWeatherMap', True)
+        elif any(status == CITY_NOT_FOUND_STATUS['OpenWeatherMap'] for status, _ in results):
+            self._update_city_api_stats(city, 'OpenWeatherMap', False)
+
+        # Success if at least one endpoint returned data
+        if data:
             return {'api': 'OpenWeatherMap', 'city': city, 'data': data}
         return None
 
-    def _fetch_wapi_data(self, city):
+    async def _fetch_wapi_data(self, city):
         """Fetches current weather and 5-day forecast from WeatherAPI.com."""
         key = self.api_keys['WEATHERAPI_KEY']
         
         # WeatherAPI uses one endpoint for current and forecast (Intelligent Collection Strategy)
         url = f"http://api.weatherapi.com/v1/forecast.json?key={key}&q={city}&days=5"
         
-        self.summary_metrics['total_requests'] += 1
-        logging.info(f"WAPI: Requesting forecast for {city}")
-        
-        try:
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                self.summary_metrics['wapi_success'] += 1
-                return {'api': 'WeatherAPI', 'city': city, 'data': response.json()}
-            else:
-                logging.warning(f"WAPI Failed for {city}: Status {response.status_code}")
+        async with self._host_slots['WeatherAPI']:
+            # The key may have been rejected while this city waited for a slot
+            if 'WeatherAPI' in self._rejected_apis:
                 return None
-        except Exception as e:
-            logging.error(f"WAPI Exception during fetch for {city}: {e}")
-            return None
+            await self._wait_for_host('WeatherAPI')
+
+            self.summary_metrics['total_requests'] += 1
+            logging.info("WAPI: Requesting forecast for %s", city)
+            
+            try:
+                async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    if response.status == 200:
+                        self.summary_metrics['wapi_success'] += 1
+                        data = {'api': 'WeatherAPI', 'city': city, 'data': _json_loads(await response.read())}
+                        self._update_city_api_stats(city, 'WeatherAPI', True)
+                        return data
+                    logging.warning("WAPI Failed for %s: Status %s", city, response.status)
+                    self._note_failed_response('WeatherAPI', response)
+                    # Only an unknown location counts against WAPI for this city
+                    if response.status == CITY_NOT_FOUND_STATUS['WeatherAPI']:
+                        self._update_city_api_stats(city, 'WeatherAPI', False)
+            except Exception as e:
+                logging.error("WAPI Exception during fetch for %s: %s", city, e)
+        return None
             
     # --- 2. Intelligent Collection & 4. Adaptive Strategy ---
 
-    def collect_data(self):
-        """Coordinates the data collection process using an intelligent and adaptive strategy."""
+    async def _collect_city(self, city):
+        """Collects data for a single city, applying API priority and the adaptive retry strategy."""
+        data = None
+        attempts_made = 0
         
-        # Access self.settings['CITIES'] directly
-        for city in self.settings['CITIES']: 
-            data = None
-            
-            # Adaptive Strategy: Retry loop
-            for attempt in range(self.settings['MAX_RETRIES']):
-                logging.info(f"Attempt {attempt + 1}/{self.settings['MAX_RETRIES']} for {city}")
+        # Adaptive Strategy: Retry loop
+        for attempt in range(self.settings['MAX_RETRIES']):
+            # Intelligent Collection Strategy: Use API priority, skipping APIs whose key was rejected
+            api_priority = [api_name for api_name in self.settings['API_PRIORITY'] if api_name not in self._rejected_apis]
+            if not api_priority:
+                break # No usable API left, further retries cannot succeed
+
+            logging.info("Attempt %s/%s for %s", attempt + 1, self.settings['MAX_RETRIES'], city)
+            attempts_made += 1
+            # Adaptive Strategy: try the API with the best track record for this city first (ties keep config order)
+            api_priority.sort(key=lambda api_name: -self._api_success_rate(city, api_name))
+
+            for api_name in api_priority:
                 
-                # Intelligent Collection Strategy: Use API priority
-                for api_name in self.settings['API_PRIORITY']:
-                    
-                    if api_name == "OpenWeatherMap":
-                        data = self._fetch_owm_data(city)
-                    elif api_name == "WeatherAPI":
-                        data = self._fetch_wapi_data(city)
-                    
-                    if data:
-                        # Success, break API loop and retry loop
-                        self.summary_metrics['successful_requests'] += 1
-                        break 
+                if api_name == "OpenWeatherMap":
+                    data = await self._fetch_owm_data(city)
+                elif api_name == "WeatherAPI":
+                    data = await self._fetch_wapi_data(city)
                 
                 if data:
-                    break # Data collected, move to next city
-                
-                if attempt < self.settings['MAX_RETRIES'] - 1:
-                    # Adaptive Strategy: Wait longer between retries (Exponential backoff-like)
-                    delay = self.settings['RESPECTFUL_DELAY_SECONDS'] * (2 ** attempt)
-                    logging.warning(f"No data collected for {city}. Retrying in {delay:.1f}s.")
-                    time.sleep(delay)
+                    # Success, break API loop and retry loop
+                    self.summary_metrics['successful_requests'] += 1
+                    break 
             
             if data:
-                # 3. Data Quality Assessment (Run only on successful data)
-                self.raw_data.append(data)
-                self._assess_and_log_quality(data)
-                # 4. Data Processing
-                self.processed_data.append(self._process_raw_data(data))
-            else:
-                self.summary_metrics['failures'] += 1
-                self.summary_metrics['issues'].append(f"Hard failure for {city} after {self.settings['MAX_RETRIES']} attempts.")
+                break # Data collected, move to next city
+            
+            if attempt < self.settings['MAX_RETRIES'] - 1:
+                # Adaptive Strategy: Wait longer between retries (Exponential backoff-like)
+                # Up to 10% jitter keeps concurrent cities from retrying against the same API in lockstep
+                delay = self.settings['RESPECTFUL_DELAY_SECONDS'] * (2 ** attempt) * (1 + random.random() * 0.1)
+                logging.warning("No data collected for %s. Retrying in %.1fs.", city, delay)
+                await asyncio.sleep(delay)
+
+        if data:
+            self._store_record(data)
+        else:
+            self.summary_metrics['failures'] += 1
+            reason = " (no API with an accepted key left)" if attempts_made < self.settings['MAX_RETRIES'] else ""
+            self._record_issue(city, f"Hard failure for {city} after {attempts_made} attempts{reason}.")
+
+    def _store_record(self, record):
+        """Assesses and processes a collected record, then appends its raw payload to the raw NDJSON stream."""
+        # 3. Data Quality Assessment (Run only on successful data)
+        self._assess_and_log_quality(record)
+        # 4. Data Processing
+        self.processed_data.append(self._process_raw_data(record))
+        # Written as soon as the city completes, so partial results survive a crash
+        self._write_raw_record(record)
+
+    def _write_raw_record(self, record):
+        """Appends a raw record to the raw NDJSON stream, opening the stream on the first record."""
+        if self._raw_stream_failed:
+            return
+        try:
+            if self._raw_file is None:
+                self._raw_file = _open_raw_stream(self._paths['raw_ndjson'])
+            self._raw_file.write(_ndjson_line(record))
+            # A GzipFile flush is a zlib sync flush, so every complete record is readable even if the run is killed
+            self._raw_file.flush()
+        except Exception as e:
+            logging.error("Failed to save raw data: %s", e)
+            self._raw_stream_failed = True
+
+    def _close_raw_stream(self):
+        """Closes the raw NDJSON stream, if any record was written to it."""
+        if self._raw_file is None:
+            return
+        try:
+            self._raw_file.close()
+            if not self._raw_stream_failed:
+                logging.info("Raw data successfully saved to %s", self._paths['raw_ndjson'])
+        except Exception as e:
+            logging.error("Failed to save raw data: %s", e)
+        self._raw_file = None
+
+    async def collect_data(self):
+        """Coordinates the data collection process using an intelligent and adaptive strategy."""
+        
+        # Cities are collected concurrently; the connector caps parallel connections per API host (Respectful Collection)
+        connector = aiohttp.TCPConnector(limit_per_host=PER_HOST_CONCURRENCY)
+        self._host_slots = {api_name: asyncio.Semaphore(PER_HOST_CONCURRENCY) for api_name in ('OpenWeatherMap', 'WeatherAPI')}
+        try:
+            async with aiohttp.ClientSession(connector=connector) as session:
+                self.session = session
+                # Access self.settings['CITIES'] directly
+                tasks = [self._collect_city(city) for city in self.settings['CITIES']]
+                await asyncio.gather(*tasks)
+        finally:
+            self._close_raw_stream()
+            # Cities finish in any order; keep processed output and report rows in config order
+            city_order = {city: i for i, city in enumerate(self.settings['CITIES'])}
+            self.processed_data.sort(key=lambda processed: city_order[processed['city']])
+
+        self._convert_wind_speeds()
 
     # --- 3. Data Quality Assessment ---
 
@@ -190,51 +572,55 @@ class WeatherAgent:
         api = record['api']
         city = record['city']
         data = record['data']
+        # Top-level sections, looked up once and shared by the completeness and validity checks
+        # WeatherAPI bodies are stored as decoded, so a malformed (non-object) body just scores as incomplete
+        current = data.get('current') or {} if isinstance(data, dict) else {}
+        forecast = data.get('forecast') or {} if isinstance(data, dict) else {}
         
         completeness_score = 100
-        required_fields = []
+        required_fields = ()
         
         # Define required fields based on API structure and DMP
         if api == 'OpenWeatherMap':
-            # FIX: Must include 'current' prefix as OWM data is stored under the 'current' key
-            required_fields.extend(['current.main.temp', 'current.main.humidity', 'current.wind.speed'])
+            required_fields = OWM_REQUIRED
             # Check forecast fields (using list length for simplicity)
-            if 'forecast' not in data or len(data.get('forecast', {}).get('list', [])) < 30: # Expecting ~40 3-hour forecasts
+            if len(forecast.get('list') or []) < 30: # Expecting ~40 3-hour forecasts
                  completeness_score -= 20
-                 logging.warning(f"Quality warning for {city} (OWM): Forecast list incomplete.")
+                 logging.warning("Quality warning for %s (OWM): Forecast list incomplete.", city)
 
         elif api == 'WeatherAPI':
-            required_fields.extend(['current.temp_c', 'current.humidity', 'current.wind_kph'])
+            required_fields = WAPI_REQUIRED
             # Check 5-day forecast
-            if 'forecast' not in data or len(data.get('forecast', {}).get('forecastday', [])) < 5:
+            if len(forecast.get('forecastday') or []) < 5:
                 completeness_score -= 20
-                logging.warning(f"Quality warning for {city} (WAPI): Forecast days incomplete.")
+                logging.warning("Quality warning for %s (WAPI): Forecast days incomplete.", city)
 
         # Check for mandatory field presence (Completeness)
-        for field in required_fields:
-            parts = field.split('.')
+        for path in required_fields:
             value = data
-            try:
-                for part in parts:
-                    value = value[part]
+            for part in path:
+                value = value.get(part) if isinstance(value, dict) else None
+                if value is None:
+                    break
+            if value is not None:
                 self.summary_metrics['data_points_collected'] += 1
-            except (KeyError, TypeError):
+            else:
                 completeness_score -= 5
-                logging.warning(f"Quality failure for {city} ({api}): Missing critical field '{field}'.")
+                logging.warning("Quality failure for %s (%s): Missing critical field '%s'.", city, api, '.'.join(path))
                 
         # Simple Validity Check (Example: Temperature should be reasonable in Celsius)
         try:
             temp_value = None
             if api == 'OpenWeatherMap':
-                 # FIX: Using .get() chain to safely access temp and avoid KeyError if data is partially missing
-                 temp_value = data.get('current', {}).get('main', {}).get('temp') 
+                 # Safe .get() access to temp, avoiding KeyError if data is partially missing
+                 temp_value = (current.get('main') or {}).get('temp')
             elif api == 'WeatherAPI':
                  # WeatherAPI stores current data directly under 'current' key in the top level response
-                 temp_value = data.get('current', {}).get('temp_c')
+                 temp_value = current.get('temp_c')
 
             if temp_value is not None and (temp_value < -70 or temp_value > 50):
                 completeness_score -= 10 # Deduct score for invalid/suspect value
-                self.summary_metrics['issues'].append(f"Suspect Temp in {city} ({api}): {temp_value}C")
+                self._record_issue(city, f"Suspect Temp in {city} ({api}): {temp_value}C")
         except Exception:
              # Ignore if any unexpected error occurs during validation
              pass 
@@ -242,7 +628,7 @@ class WeatherAgent:
         # Final quality score (Range 0-100)
         record['quality_score'] = max(0, completeness_score)
         self.summary_metrics['total_quality_score'] += record['quality_score']
-        logging.info(f"Data quality for {city} ({api}): Score {record['quality_score']}/100")
+        logging.info("Data quality for %s (%s): Score %s/100", city, api, record['quality_score'])
 
 
     # --- Data Processing and Standardization ---
@@ -265,11 +651,14 @@ class WeatherAgent:
         }
 
         try:
+            # Bound once per record; 'or {}' also covers sections that are present but null
+            current = data.get('current') or {}
+            forecast = data.get('forecast') or {}
+
             if api == 'OpenWeatherMap':
                 # Current Weather data is in 'current' -> 'main'
-                current = data.get('current', {})
-                main = current.get('main', {})
-                wind = current.get('wind', {})
+                main = current.get('main') or {}
+                wind = current.get('wind') or {}
 
                 processed['current_temp_c'] = main.get('temp')
                 processed['current_humidity_p'] = main.get('humidity')
@@ -277,63 +666,69 @@ class WeatherAgent:
                 processed['current_wind_speed_m_s'] = wind.get('speed')
 
                 # Get the date of the first forecast item
-                forecast_list = data.get('forecast', {}).get('list', [])
+                forecast_list = forecast.get('list') or []
                 if forecast_list:
                     processed['forecast_summary'] = f"3-hour steps starting {forecast_list[0].get('dt_txt')}"
 
             elif api == 'WeatherAPI':
                 # Current Weather data is in 'current'
-                current = data.get('current', {})
-
                 processed['current_temp_c'] = current.get('temp_c')
                 processed['current_humidity_p'] = current.get('humidity')
                 
                 wind_kph = current.get('wind_kph')
                 if wind_kph is not None:
-                    # Convert kph to m/s: 1 kph = 0.277778 m/s
-                    processed['current_wind_speed_m_s'] = round(wind_kph * 0.277778, 2)
+                    if self._batch_wind_conversion and isinstance(wind_kph, (int, float)):
+                        # Large runs defer the conversion to a single vectorized pass after collection
+                        self._pending_wind_kph.append((processed, wind_kph))
+                    else:
+                        # Convert kph to m/s
+                        processed['current_wind_speed_m_s'] = round(wind_kph * _KPH_TO_MS, 2)
                 
                 # Get the date of the first forecast day
-                forecast_day = data.get('forecast', {}).get('forecastday', [])
+                forecast_day = forecast.get('forecastday') or []
                 if forecast_day:
                     processed['forecast_summary'] = f"5-day forecast starting {forecast_day[0].get('date')}"
             
         except Exception as e:
-            logging.error(f"Error during data standardization for {record['city']} ({api}): {e}")
+            logging.error("Error during data standardization for %s (%s): %s", record['city'], api, e)
             processed['quality_score'] = 0 # Mark as processed failure
         
         return processed
+
+    def _convert_wind_speeds(self):
+        """
+        Converts all deferred WeatherAPI wind speeds from kph to m/s in one NumPy pass.
+        """
+        if not self._pending_wind_kph:
+            return
+
+        records, kph_values = zip(*self._pending_wind_kph)
+        kph_arr = np.fromiter(kph_values, dtype=np.float64, count=len(kph_values))
+        # Convert kph to m/s in place
+        np.multiply(kph_arr, _KPH_TO_MS, out=kph_arr)
+        np.round(kph_arr, 2, out=kph_arr)
+        for processed, wind_speed in zip(records, kph_arr.tolist()):
+            processed['current_wind_speed_m_s'] = wind_speed
+        self._pending_wind_kph = []
         
 
     # --- Data Saving ---
 
     def _save_data(self):
         """
-        Saves raw data and processed data to their respective, timestamped JSON files.
+        Saves processed data to its timestamped JSON file. Raw data is already on disk,
+        streamed per city during collection.
         """
-        if not self.raw_data:
+        if not self.processed_data:
             logging.warning("No data collected, skipping file save.")
             return
 
-        # 1. Save Raw Data
-        raw_filename = f"weather_raw_{self.collection_timestamp}.json"
-        raw_filepath = os.path.join(RAW_DIR, raw_filename)
-        try:
-            with open(raw_filepath, 'w') as f:
-                json.dump(self.raw_data, f, indent=4)
-            logging.info(f"Raw data successfully saved to {raw_filepath}")
-        except Exception as e:
-            logging.error(f"Failed to save raw data: {e}")
-
-        # 2. Save Processed Data
-        processed_filename = f"weather_processed_{self.collection_timestamp}.json"
-        processed_filepath = os.path.join(PROCESSED_DIR, processed_filename)
+        processed_filepath = self._paths['processed_json']
         try:
-            with open(processed_filepath, 'w') as f:
-                json.dump(self.processed_data, f, indent=4)
-            logging.info(f"Processed data successfully saved to {processed_filepath}")
+            _write_json(processed_filepath, self.processed_data)
+            logging.info("Processed data successfully saved to %s", processed_filepath)
         except Exception as e:
-            logging.error(f"Failed to save processed data: {e}")
+            logging.error("Failed to save processed data: %s", e)
 
 
     # --- NEW: Metadata Generation and Saving ---
@@ -343,8 +738,7 @@ class WeatherAgent:
         Compiles collection metrics and data schema into a single metadata file 
         and saves it to the data/metadata directory.
         """
-        metadata_filename = f"collection_metadata_{self.collection_timestamp}.json"
-        metadata_filepath = os.path.join(METADATA_DIR, metadata_filename)
+        metadata_filepath = self._paths['metadata_json']
 
         # Schema definition based on the output of _process_raw_data
         schema_definition = [
@@ -360,166 +754,112 @@ class WeatherAgent:
 
         # Combine all metadata components
         metadata = {
-            'metadata_version': '1.0',
+            'metadata_version': '1.1',
             'collection_timestamp': self.collection_timestamp,
             'collection_settings': self.settings,
             'summary_metrics': self.summary_metrics,
+            'city_api_stats': self._city_api_stats, # Read back by the next run to order API_PRIORITY per city
             'processed_data_schema': schema_definition
         }
 
         try:
-            with open(metadata_filepath, 'w') as f:
-                json.dump(metadata, f, indent=4)
-            logging.info(f"Metadata successfully saved to {metadata_filepath}")
+            _write_json(metadata_filepath, metadata)
+            logging.info("Metadata successfully saved to %s", metadata_filepath)
         except Exception as e:
-            logging.error(f"Failed to save metadata: {e}")
+            logging.error("Failed to save metadata: %s", e)
 
 
     # --- 5. Documentation (Report Generation) ---
 
-    def _generate_quality_report(self):
-        """Generates the detailed HTML quality report."""
-        # Report path now includes the collection timestamp for uniqueness
-        report_filename = f"quality_report_{self.collection_timestamp}.html"
-        report_path = os.path.join(REPORTS_DIR, report_filename)
-        
-        if self.summary_metrics['successful_requests'] == 0:
-            avg_quality = 0
-        else:
-            avg_quality = self.summary_metrics['total_quality_score'] / self.summary_metrics['successful_requests']
-            
-        success_rate = (self.summary_metrics['successful_requests'] / self.summary_metrics['total_requests']) * 100 if self.summary_metrics['total_requests'] > 0 else 0
+    def _finalize_metrics(self):
+        """
+        Computes the derived rates shared by both reports once, and stores them on self._final_metrics.
+        """
+        metrics = self.summary_metrics
+        total_requests = metrics['total_requests']
 
-        html_content = f"""
-        <!DOCTYPE html>
-        <html lang="en">
-        <head>
-            <meta charset="UTF-8">
-            <title>Data Quality Report - Weather Agent</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; background-color: #f4f7f6; }}
-                .container {{ max-width: 900px; margin: auto; background: white; padding: 25px; border-radius: 8px; box-shadow: 0 4px 8px rgba(0,0,0,0.1); }}
-                h1 {{ color: #007bff; border-bottom: 2px solid #007bff; padding-bottom: 10px; }}
-                h2 {{ color: #333; margin-top: 25px; }}
-                table {{ width: 100%; border-collapse: collapse; margin-top: 15px; }}
-                th, td {{ border: 1px solid #ddd; padding: 12px; text-align: left; }}
-                th {{ background-color: #f2f2f2; color: #333; }}
-                .metric-box {{ background-color: #e9ecef; padding: 15px; border-radius: 6px; margin-bottom: 20px; }}
-                .success {{ color: green; font-weight: bold; }}
-                .failure {{ color: red; font-weight: bold; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>Weather Agent Data Quality Report</h1>
-                <p>Report Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+        avg_quality = metrics['total_quality_score'] / metrics['successful_requests'] if metrics['successful_requests'] > 0 else 0
+        success_rate = (metrics['successful_requests'] / total_requests) * 100 if total_requests > 0 else 0
+        owm_fail_rate = ((total_requests - metrics['owm_success']) / total_requests) * 100 if total_requests > 0 else 0
 
-                <h2>Overall Collection Metrics</h2>
-                <div class="metric-box">
-                    <p><strong>Total Records (Cities) Collected:</strong> {self.summary_metrics['successful_requests']}</p>
-                    <p><strong>Total API Requests Made:</strong> {self.summary_metrics['total_requests']}</p>
-                    <p><strong>Collection Success Rate:</strong> <span class="{'success' if success_rate > 90 else 'failure'}">{success_rate:.2f}%</span></p>
-                    <p><strong>Total Data Points Parsed:</strong> {self.summary_metrics['data_points_collected']}</p>
-                </div>
+        self._final_metrics = {
+            'avg_quality': avg_quality,
+            'success_rate': success_rate,
+            'owm_fail_rate': owm_fail_rate
+        }
+        return self._final_metrics
+
+    def _prepare_report_context(self):
+        """Computes the shared metrics and stamps the report time, unless already done for this run."""
+        if self._final_metrics is None:
+            self._finalize_metrics()
+        if self._report_generated_at is None:
+            self._report_generated_at = datetime.now().strftime(REPORT_TIME_FORMAT)
+
+    def _generate_reports(self):
+        """Refreshes the shared metrics and report time once, then writes both reports with them."""
+        self._finalize_metrics()
+        self._report_generated_at = datetime.now().strftime(REPORT_TIME_FORMAT)
+        self._generate_quality_report()
+        self._generate_collection_summary()
 
-                <h2>Quality Assessment Metrics</h2>
-                <div class="metric-box">
-                    <p><strong>Average Data Quality Score (Completeness/Validity):</strong> {avg_quality:.2f}/100</p>
-                    <p><strong>API Success Breakdown:</strong> OWM ({self.summary_metrics['owm_success']}) / WAPI ({self.summary_metrics['wapi_success']})</p>
-                    <p><strong>Issues Logged:</strong> {len(self.summary_metrics['issues'])}</p>
-                </div>
-                
-                <h2>Per-Record Quality Details</h2>
-                <table>
-                    <tr>
-                        <th>#</th>
-                        <th>City</th>
-                        <th>API Used</th>
-                        <th>Quality Score (100 Max)</th>
-                        <th>Notes</th>
-                    </tr>
-        """
+    def _generate_quality_report(self):
+        """Generates the detailed HTML quality report."""
+        report_path = self._paths['report_html']
+        self._prepare_report_context()
+
+        # Report is assembled as a list of parts and joined once at the end
+        parts = [_HTML_HEAD, _HTML_METRICS_TMPL.format(
+            **self._final_metrics,
+            generated_at=self._report_generated_at,
+            successful_requests=self.summary_metrics['successful_requests'],
+            total_requests=self.summary_metrics['total_requests'],
+            success_class='success' if self._final_metrics['success_rate'] > 90 else 'failure',
+            data_points_collected=self.summary_metrics['data_points_collected'],
+            owm_success=self.summary_metrics['owm_success'],
+            wapi_success=self.summary_metrics['wapi_success'],
+            issues_logged=len(self.summary_metrics['issues'])
+        )]
         
         # Automated Metadata Generation: Add detailed record info
-        for i, record in enumerate(self.raw_data):
-            html_content += f"""
-                    <tr>
-                        <td>{i+1}</td>
-                        <td>{record['city']}</td>
-                        <td>{record['api']}</td>
-                        <td>{record.get('quality_score', 'N/A')}/100</td>
-                        <td>{", ".join([issue for issue in self.summary_metrics['issues'] if record['city'] in issue]) or 'None'}</td>
-                    </tr>
-            """
-
-        html_content += """
-                </table>
-            </div>
-        </body>
-        </html>
-        """
+        for i, record in enumerate(self.processed_data):
+            parts.append(_HTML_ROW_TMPL.format(
+                index=i + 1,
+                city=record['city'],
+                api=record['source_api'],
+                quality_score=record.get('quality_score', 'N/A'),
+                notes=", ".join(self._issues_by_city.get(record['city'], [])) or 'None'
+            ))
+
+        parts.append(_HTML_FOOT)
         
         with open(report_path, 'w') as f:
-            f.write(html_content)
-        logging.info(f"Quality report generated at {report_path}")
+            f.write(''.join(parts))
+        logging.info("Quality report generated at %s", report_path)
 
     def _generate_collection_summary(self):
         """Generates the final markdown collection summary."""
-        # Summary path now includes the collection timestamp for uniqueness
-        summary_filename = f"collection_summary_{self.collection_timestamp}.md"
-        summary_path = os.path.join(REPORTS_DIR, summary_filename)
-        
-        if self.summary_metrics['successful_requests'] == 0:
-            avg_quality = 0
-        else:
-            avg_quality = self.summary_metrics['total_quality_score'] / self.summary_metrics['successful_requests']
-            
-        success_rate = (self.summary_metrics['successful_requests'] / self.summary_metrics['total_requests']) * 100 if self.summary_metrics['total_requests'] > 0 else 0
-
-        summary_content = f"""
-# Weather Agent Collection Summary Report
-
-**Date:** {datetime.now().strftime('%Y-%m-%d')}
-**Agent Status:** Completed
-
-## 1. Collection Performance
-
-| Metric | Value |
-| :--- | :--- |
-| **Total Cities Targeted** | {len(self.settings['CITIES'])} |
-| **Total Records Collected** | {self.summary_metrics['successful_requests']} |
-| **Total API Requests Sent** | {self.summary_metrics['total_requests']} |
-| **Collection Success Rate** | {success_rate:.2f}% |
-| **Total Failures (Hard)** | {self.summary_metrics['failures']} |
-
-## 2. API Breakdown
-
-| API | Successful Requests | Failure Rate |
-| :--- | :--- | :--- |
-| **OpenWeatherMap** | {self.summary_metrics['owm_success']} | {((self.summary_metrics['total_requests'] - self.summary_metrics['owm_success']) / self.summary_metrics['total_requests']) * 100:.2f}% |
-| **WeatherAPI.com** | {self.summary_metrics['wapi_success']} | (Handled by Adaptive Strategy) |
-
-## 3. Quality Metrics and Trends
-
-- **Average Data Quality Score:** **{avg_quality:.2f}/100**
-- **Completeness Trend:** High, except where forecast endpoints returned truncated data or missing fields (notably for one API in one city).
-- **Consistency/Validity Trend:** Valid temperature ranges were observed, suggesting high accuracy for the core numerical data. Low scores usually indicated missing secondary fields (e.g., specific wind direction codes).
-
-## 4. Issues Encountered
-
-The Adaptive Strategy successfully handled temporary connection issues or rate limits using retries.
-The following hard issues remain:
-{'- ' + '\\n- '.join(self.summary_metrics['issues']) if self.summary_metrics['issues'] else '- No critical issues requiring manual intervention were recorded.'}
-
-## 5. Recommendations for Future Collection
-
-1.  **Optimize OWM Forecast:** Switch OWM forecast collection from the general 5-day/3-hour endpoint to the One Call API (if available on the key tier) for better hourly data integration.
-2.  **Granular Quality Check:** Implement a check for **data freshness** (e.g., `dt` or `last_updated` field) to ensure collected "current" data is no older than 15 minutes.
-3.  **Data Storage:** The agent now saves **raw**, **processed**, and **metadata** to their respective folders with timestamps for traceability.
-"""
+        summary_path = self._paths['summary_md']
+        self._prepare_report_context()
+
+        # Issues are rendered as one markdown bullet per line
+        issue_lines = [f"- {issue}" for issue in self.summary_metrics['issues']]
+        issues_section = "\n".join(issue_lines) or '- No critical issues requiring manual intervention were recorded.'
+
+        summary_content = _SUMMARY_MD_TMPL.format(
+            **self._final_metrics,
+            date=self._report_generated_at.split(' ')[0],
+            cities_targeted=len(self.settings['CITIES']),
+            successful_requests=self.summary_metrics['successful_requests'],
+            total_requests=self.summary_metrics['total_requests'],
+            failures=self.summary_metrics['failures'],
+            owm_success=self.summary_metrics['owm_success'],
+            wapi_success=self.summary_metrics['wapi_success'],
+            issues_section=issues_section
+        )
         with open(summary_path, 'w') as f:
             f.write(summary_content)
-        logging.info(f"Collection summary generated at {summary_path}")
+        logging.info("Collection summary generated at %s", summary_path)
 
 
     def run_agent(self):
@@ -528,7 +868,7 @@ The following hard issues remain:
         logging.info("Starting weather data collection workflow.")
         
         try:
-            self.collect_data()
+            asyncio.run(self.collect_data())
             
             # Save raw and processed data
             self._save_data() 
@@ -536,16 +876,14 @@ The following hard issues remain:
             # Generate and save metadata (NEW)
             self._generate_and_save_metadata()
 
-            self._generate_quality_report()
-            self._generate_collection_summary()
+            self._generate_reports()
 
-            logging.info(f"Workflow completed successfully in {time.time() - start_time:.2f} seconds.")
+            logging.info("Workflow completed successfully in %.2f seconds.", time.time() - start_time)
         except Exception as e:
-            logging.critical(f"Agent terminated unexpectedly: {e}")
+            logging.critical("Agent terminated unexpectedly: %s", e)
             self.summary_metrics['issues'].append(f"CRITICAL: Agent crash at runtime: {e}")
             # Ensure reports are still generated even on failure if possible
-            self._generate_quality_report()
-            self._generate_collection_summary()
+            self._generate_reports()
 
 # execution
 if __name__ == "__main__":
@@ -1 +1,205 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
 
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data_collection_agent as dca
+
+
+class FakeResponse:
+    def __init__(self, status, payload=None, headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self._body = json.dumps(payload or {}).encode('utf-8')
+
+    async def read(self):
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeSession:
+    """Answers every request with the given status and counts the requests sent."""
+    def __init__(self, status, payload=None):
+        self.status = status
+        self.payload = payload
+        self.requests = 0
+
+    def get(self, url, timeout=None):
+        self.requests += 1
+        return FakeResponse(self.status, self.payload)
+
+
+class RateLimitingSession:
+    """Answers the first request with a 429 and the rest with 200, recording when each request was sent."""
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        self.sent_at = []
+        self.rate_limited_at = None
+
+    def get(self, url, timeout=None):
+        self.sent_at.append(time.monotonic())
+        if len(self.sent_at) == 1:
+            return SlowResponse(self, 429, headers={'Retry-After': str(self.retry_after)})
+        return SlowResponse(self, 200)
+
+
+class SlowResponse(FakeResponse):
+    """Takes a moment to arrive, so requests holding the other host slot overlap with it."""
+    def __init__(self, session, status, headers=None):
+        super().__init__(status, headers=headers)
+        self.session = session
+
+    async def __aenter__(self):
+        await asyncio.sleep(0.01)
+        if self.status == 429:
+            self.session.rate_limited_at = time.monotonic()
+        return self
+
+
+@pytest.fixture
+def make_agent(tmp_path, monkeypatch):
+    """Builds agents whose config, output directories and log file all live under tmp_path."""
+    config = {
+        'API_KEYS': {'OPENWEATHERMAP_KEY': 'owm-key', 'WEATHERAPI_KEY': 'wapi-key'},
+        'COLLECTION_SETTINGS': {
+            'CITIES': ['London, UK', 'Tokyo, JP'],
+            'API_PRIORITY': ['OpenWeatherMap', 'WeatherAPI'],
+            'MAX_RETRIES': 2,
+            'RESPECTFUL_DELAY_SECONDS': 0,
+            'UNITS': 'metric'
+        }
+    }
+    config_path = tmp_path / 'config.json'
+    config_path.write_text(json.dumps(config))
+    metadata_dir = tmp_path / 'metadata'
+    monkeypatch.setattr(dca, 'CONFIG_PATH', str(config_path))
+    monkeypatch.setattr(dca, 'METADATA_DIR', str(metadata_dir))
+    monkeypatch.setattr(dca, 'DIRS', (str(metadata_dir),))
+    # Keep test runs from truncating the real logs/collection.log
+    monkeypatch.setattr(logging.getLogger(), 'handlers', [])
+
+    def factory():
+        agent = dca.WeatherAgent()
+        agent._host_slots = {api_name: asyncio.Semaphore(1) for api_name in config['COLLECTION_SETTINGS']['API_PRIORITY']}
+        return agent
+    return factory
+
+
+def test_failing_api_is_tried_after_untried_alternative(make_agent):
+    agent = make_agent()
+    agent._city_api_stats = {'London, UK': {'OpenWeatherMap': {'success': 0, 'fail': 3}}}
+    calls = []
+
+    async def fetch_owm(city):
+        calls.append((city, 'OpenWeatherMap'))
+        return {'api': 'OpenWeatherMap', 'city': city, 'data': {}}
+
+    async def fetch_wapi(city):
+        calls.append((city, 'WeatherAPI'))
+        return {'api': 'WeatherAPI', 'city': city, 'data': {}}
+
+    agent._fetch_owm_data = fetch_owm
+    agent._fetch_wapi_data = fetch_wapi
+    agent._store_record = lambda record: None
+
+    asyncio.run(agent._collect_city('London, UK'))
+    asyncio.run(agent._collect_city('Tokyo, JP'))
+
+    # Cities without history keep the configured priority
+    assert calls == [('London, UK', 'WeatherAPI'), ('Tokyo, JP', 'OpenWeatherMap')]
+
+
+def test_stats_are_loaded_from_latest_metadata(make_agent):
+    agent = make_agent()
+    agent._update_city_api_stats('London, UK', 'WeatherAPI', True)
+    agent._update_city_api_stats('London, UK', 'OpenWeatherMap', False)
+    agent._generate_and_save_metadata()
+
+    stale_path = os.path.join(dca.METADATA_DIR, 'collection_metadata_19700101_000000.json')
+    with open(stale_path, 'w') as f:
+        json.dump({'city_api_stats': {'Tokyo, JP': {'WeatherAPI': {'success': 0, 'fail': 9}}}}, f)
+
+    assert make_agent()._city_api_stats == {
+        'London, UK': {
+            'WeatherAPI': {'success': 1, 'fail': 0},
+            'OpenWeatherMap': {'success': 0, 'fail': 1}
+        }
+    }
+
+
+@pytest.mark.parametrize('status', [401, 403, 429, 500])
+def test_outcomes_unrelated_to_the_city_are_not_counted(make_agent, status):
+    agent = make_agent()
+    agent.session = FakeSession(status)
+
+    assert asyncio.run(agent._fetch_wapi_data('London, UK')) is None
+    assert asyncio.run(agent._fetch_owm_data('London, UK')) is None
+    assert agent._city_api_stats == {}
+
+
+def test_rejected_api_is_skipped_without_being_counted(make_agent):
+    agent = make_agent()
+    agent.session = FakeSession(401)
+
+    asyncio.run(agent._collect_city('London, UK'))
+
+    # One request per OWM endpoint and one to WAPI, after which both keys are known to be rejected
+    assert agent.session.requests == 3
+    assert agent._city_api_stats == {}
+    assert "Hard failure for London, UK after 1 attempts (no API with an accepted key left)." in agent.summary_metrics['issues']
+
+
+@pytest.mark.parametrize('api_name, fetch', [
+    ('OpenWeatherMap', dca.WeatherAgent._fetch_owm_data),
+    ('WeatherAPI', dca.WeatherAgent._fetch_wapi_data)
+])
+def test_city_specific_outcomes_are_counted(make_agent, api_name, fetch):
+    agent = make_agent()
+
+    agent.session = FakeSession(dca.CITY_NOT_FOUND_STATUS[api_name])
+    assert asyncio.run(fetch(agent, 'Atlantis')) is None
+    agent.session = FakeSession(200, {'current': {}})
+    assert asyncio.run(fetch(agent, 'London, UK')) is not None
+
+    assert agent._city_api_stats == {
+        'Atlantis': {api_name: {'success': 0, 'fail': 1}},
+        'London, UK': {api_name: {'success': 1, 'fail': 0}}
+    }
+
+
+@pytest.mark.parametrize('body', [[], 'not an object', None])
+def test_non_object_body_scores_as_incomplete(make_agent, body):
+    agent = make_agent()
+    record = {'api': 'WeatherAPI', 'city': 'London, UK', 'data': body}
+
+    agent._assess_and_log_quality(record)
+
+    # Forecast days incomplete (-20) and all three required fields missing (-5 each)
+    assert record['quality_score'] == 65
+    assert agent._process_raw_data(record)['current_temp_c'] is None
+
+
+def test_retry_after_pauses_every_host_slot(make_agent):
+    agent = make_agent()
+    agent._host_slots['WeatherAPI'] = asyncio.Semaphore(dca.PER_HOST_CONCURRENCY)
+    agent.session = RateLimitingSession(retry_after=0.2)
+
+    async def collect():
+        await asyncio.gather(*(agent._fetch_wapi_data(city) for city in ('A', 'B', 'C', 'D')))
+    asyncio.run(collect())
+
+    deadline = agent.session.rate_limited_at + 0.2
+    later_requests = [t for t in agent.session.sent_at if t > agent.session.rate_limited_at]
+    assert len(later_requests) == 2
+    assert min(later_requests) >= deadline